@@ -1,33 +1,38 @@
 import os
-import re
-import statistics
-from typing import Dict, Any, List, Optional
-
-import random
+import functools
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 
 import streamlit as st
-import pandas as pd
+import numpy as np
 from dotenv import load_dotenv
 
-from src.twitch_client import TwitchClient
 from src import storage
-from src.influencer_metrics import influencer_calcs, fee_max_by_roi, fee_max_by_cpa
-from src.projections import project_twitch
+from src.influencer_metrics import InfluencerResult, influencer_calcs, fee_max_by_roi, fee_max_by_cpa
+
+if TYPE_CHECKING:
+    from src.projections import TwitchProj
 
 from io import BytesIO
 from datetime import datetime, timezone
+from openpyxl import Workbook
 from openpyxl.utils import get_column_letter
 
+# "1,234.56" -> "1.234,56" numa passada só
+_PTBR_NUM = str.maketrans({",": ".", ".": ","})
+_AT_STRIP = {ord("@"): None}
+
 def fmt_money(v, prefix="R$ "):
     if v is None:
         return "-"
-    return f"{prefix}{v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    return prefix + f"{v:,.2f}".translate(_PTBR_NUM)
 
 def fmt_int(v):
     if v is None:
         return "-"
+    if isinstance(v, int):
+        return f"{v:,}".translate(_PTBR_NUM)
     try:
-        return f"{int(round(v)):,}".replace(",", ".")
+        return f"{int(round(v)):,}".translate(_PTBR_NUM)
     except Exception:
         return "-"
 
@@ -36,68 +41,102 @@ def fmt_float(v, nd=2):
         return "-"
     return f"{v:.{nd}f}".replace(".", ",")
 
+def _fmt_all(values: Dict[str, tuple]) -> Dict[str, str]:
+    # {chave: (valor, formatador, *args)} -> {chave: texto}, numa passada só
+    return {key: fn(v, *args) for key, (v, fn, *args) in values.items()}
+
+def normalize_twitch_login(s: str) -> str:
+    s = (s or "").lower().strip()
+    s = s.removeprefix("https://").removeprefix("http://").removeprefix("www.").removeprefix("twitch.tv/")
+    return s.partition("?")[0].strip("/").translate(_AT_STRIP)
+
+@functools.lru_cache(maxsize=4096)
 def parse_twitch_duration_to_hours(s: str) -> float:
     if not s:
         return 0.0
-    h = m = sec = 0
-    mh = re.search(r"(\d+)h", s)
-    mm = re.search(r"(\d+)m", s)
-    ms = re.search(r"(\d+)s", s)
-    if mh: h = int(mh.group(1))
-    if mm: m = int(mm.group(1))
-    if ms: sec = int(ms.group(1))
-    return h + (m / 60) + (sec / 3600)
+    # Formato da Twitch: "3h42m10s" (varredura única, sem regex)
+    total = 0
+    num = 0
+    for ch in s:
+        if "0" <= ch <= "9":
+            num = num * 10 + (ord(ch) - 48)
+        elif ch == "h":
+            total += num * 3600
+            num = 0
+        elif ch == "m":
+            total += num * 60
+            num = 0
+        elif ch == "s":
+            total += num
+            num = 0
+    return total / 3600
 
 def vod_summary(vods: List[Dict[str, Any]]) -> Dict[str, Optional[float]]:
     if not vods:
         return {"vod_count": 0, "avg_vod_views": None, "median_vod_views": None, "views_per_hour": None}
 
-    views = [int(v.get("view_count", 0)) for v in vods]
-    hours = [parse_twitch_duration_to_hours(v.get("duration", "")) for v in vods]
-    total_views = sum(views)
-    total_hours = sum(hours)
+    n = len(vods)
+    views = np.fromiter((int(v.get("view_count", 0)) for v in vods), dtype=np.int64, count=n)
+    hours = np.fromiter((parse_twitch_duration_to_hours(v.get("duration", "")) for v in vods), dtype=np.float64, count=n)
+    total_views = int(views.sum())
+    total_hours = float(hours.sum())
 
-    avg_v = (total_views / len(views)) if views else None
-    med_v = float(statistics.median(views)) if views else None
+    avg_v = total_views / n
+    med_v = float(np.median(views))
     vph = (total_views / total_hours) if total_hours > 0 else None
 
-    return {"vod_count": len(vods), "avg_vod_views": avg_v, "median_vod_views": med_v, "views_per_hour": vph}
+    return {"vod_count": n, "avg_vod_views": avg_v, "median_vod_views": med_v, "views_per_hour": vph}
 
 def load_streamers_file(path: str) -> List[str]:
     if not os.path.exists(path):
         return []
-    out = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            s = line.strip()
-            if s and not s.startswith("#"):
-                out.append(s.lower())
-    seen = set()
-    uniq = []
-    for x in out:
-        if x not in seen:
-            seen.add(x)
-            uniq.append(x)
-    return uniq
-
-def df_to_xlsx_bytes(sheets: dict[str, pd.DataFrame]) -> bytes:
-    """Gera um .xlsx em memória com 1+ abas (sheets)."""
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        for sheet_name, df in sheets.items():
-            safe_name = sheet_name[:31]  # limite Excel
-            df.to_excel(writer, index=False, sheet_name=safe_name)
-            ws = writer.sheets[safe_name]
-
-            # Ajuste de largura
-            for col_idx, col_name in enumerate(df.columns, start=1):
-                values = df[col_name].astype(str).values.tolist()
-                max_len = max([len(str(col_name))] + [len(v) for v in values])
-                ws.column_dimensions[get_column_letter(col_idx)].width = min(max_len + 2, 45)
+    with open(path, "rb") as f:
+        lines = (line.strip() for line in f.read().splitlines())
+    return list(dict.fromkeys(b.decode("utf-8").lower() for b in lines if b and not b.startswith(b"#")))
+
+def _rows_to_xlsx_bytes(sheets: Dict[str, Tuple[List[str], List[List[Any]]]]) -> bytes:
+    wb = Workbook(write_only=True)
+    for sheet_name, (header, rows) in sheets.items():
+        ws = wb.create_sheet(sheet_name[:31])  # limite Excel
+
+        # Ajuste de largura (write-only: precisa ser definido antes do 1º append)
+        max_len = [len(c) for c in header]
+        for row in rows:
+            for i, v in enumerate(row):
+                if v is not None:
+                    max_len[i] = max(max_len[i], len(str(v)))
+        for col_idx, n in enumerate(max_len, start=1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = min(n + 2, 45)
+
+        ws.append(header)
+        for row in rows:
+            ws.append(row)
 
+    output = BytesIO()
+    wb.save(output)
     return output.getvalue()
 
-load_dotenv()
+def dict_to_xlsx_bytes(sheets: dict[str, Dict[str, Any]]) -> bytes:
+    """Gera um .xlsx em memória com 1 linha por aba, direto dos dicts (sem DataFrame)."""
+    return _rows_to_xlsx_bytes({
+        sheet_name: (list(row), [list(row.values())])
+        for sheet_name, row in sheets.items()
+    })
+
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
+def report_xlsx_bytes(sheet_name: str, row: Dict[str, Any]) -> bytes:
+    # timestamp gerado junto com o arquivo, fora da chave do cache (ttl curto: no máx. 1 min de atraso)
+    row = {"timestamp_utc": datetime.now(timezone.utc).isoformat(), **row}
+    return dict_to_xlsx_bytes({sheet_name: row})
+
+@st.cache_data(show_spinner=False)
+def _cached_influencer_calcs(**kw) -> InfluencerResult:
+    return influencer_calcs(**kw)
+
+@st.cache_data(show_spinner=False)
+def _cached_project_twitch(**kw) -> "TwitchProj":
+    from src.projections import project_twitch  # import só quando a aba Twitch calcula
+    return project_twitch(**kw)
 
 st.set_page_config(page_title="Validação de Influenciadores", layout="wide")
 st.title("Validação de Influenciadores")
@@ -114,13 +153,26 @@ def get_cfg(key: str, default: str = "") -> str:
     except Exception:
         return default
 
-client_id = get_cfg("d2evugowek4wfnwn8hcki9gpprlxpy", "")
-client_secret = get_cfg("ud5ks4z31r7stjtanemv75t1kplnar", "")
-db_path = get_cfg("APP_DB_PATH", "./data/app.db")
+@st.cache_resource(show_spinner=False)
+def _boot_cfg() -> tuple[str, str, str]:
+    # .env/env/secrets lidos uma vez por processo
+    load_dotenv()
+    return (
+        get_cfg("TWITCH_CLIENT_ID", ""),
+        get_cfg("TWITCH_CLIENT_SECRET", ""),
+        get_cfg("APP_DB_PATH", "./data/app.db"),
+    )
+
+client_id, client_secret, db_path = _boot_cfg()
 
 
-conn = storage.connect(db_path)
-storage.init_db(conn)
+@st.cache_resource(show_spinner=False)
+def _get_conn(path: str):
+    c = storage.connect(path)
+    storage.init_db(c)
+    return c
+
+conn = _get_conn(db_path)
 
 tabs = st.tabs(["Instagram & Tik Tok", "Twitch", "Kick", "YouTube", "LinkedIn"])
 
@@ -132,49 +184,52 @@ with tabs[0]:
 
     with c1:
         st.subheader("Inputs (manual)")
-        influencer_name = st.text_input("Nome do influenciador", placeholder="Ex:Fulano")
-        fee = st.number_input("Fee / investimento (R$)", min_value=0.0, value=0.0, step=1000.0, format="%.0f")
+        # Form: o script só roda de novo no "Calcular", não a cada campo editado
+        with st.form("inf_inputs"):
+            influencer_name = st.text_input("Nome do influenciador", placeholder="Ex:Fulano")
+            fee = st.number_input("Fee / investimento (R$)", min_value=0.0, value=0.0, step=1000.0, format="%.0f")
         
-        st.markdown("### Instagram Reels")
-        reels_qty = st.number_input("Qtd Reels", min_value=0, value=0, step=1)
-        reels_avg_views = st.number_input("Views médias por Reel", min_value=0.0, value=0.0, step=1000.0, format="%.0f")
-        reels_ctr_pct = st.number_input("CTR Reels (%)", min_value=0.0, max_value=100.0, value=0.0, step=0.1, format="%.0f")
-        reels_ctr = reels_ctr_pct / 100.0
-        st.markdown("### Instagram Stories")
-        stories_qty = st.number_input("Qtd Stories (frames/combos)", min_value=0, value=0, step=1)
-        stories_avg_views = st.number_input("Views médias por Story", min_value=0.0, value=0.0, step=1000.0)
-        stories_ctr_pct = st.number_input("CTR Stories (%)", min_value=0.0, max_value=100.0, value=0.0, step=0.1, format="%.0f")
-        stories_ctr = stories_ctr_pct / 100.0
-
-        st.markdown("### TikTok")
-        tiktok_qty = st.number_input("Qtd TikToks", min_value=0, value=0, step=1)
-        tiktok_avg_views = st.number_input("Views médias por TikTok", min_value=0.0, value=0.0, step=1000.0)  
-        tiktok_ctr_pct = st.number_input("CTR TikTok (%)", min_value=0.0, max_value=100.0, value=0.0, step=0.1)
-        tiktok_ctr = tiktok_ctr_pct / 100.0
-
-        st.markdown("### Funil (FTD)")
-        manual_clicks_toggle = st.checkbox("Tenho cliques reais (sobrescrever CTR)", value=False)
-        manual_clicks = None
-        if manual_clicks_toggle:
-            manual_clicks = st.number_input("Cliques reais (total)", min_value=0.0, value=0.0, step=50.0, format="%.0f")
-
-        manual_ftd_toggle = st.checkbox("Tenho FTD real (sobrescrever projeção)", value=False)
-        manual_ftd = None
-        if manual_ftd_toggle:
-            manual_ftd = st.number_input("FTD real (total)", min_value=0.0, value=0.0, step=1.0, format="%.0f")
-
-        cvr_ftd_pct = st.number_input("CVR para FTD (%)", min_value=0.0, max_value=100.0, value=0.0, step=1.0, format="%.0f")
-        cvr_ftd = cvr_ftd_pct / 100.0
-        value_per_ftd = st.number_input("Valor por FTD (R$) — LTV/NGR médio", min_value=0.0, value=0.0, step=50.0, format="%.0f")
-
-        st.markdown("### Metas")
-        target_roi_pct = st.number_input("ROI alvo (%)", min_value=-100.0, max_value=1000.0, value=0.0, step=5.0)
-        target_roi = target_roi_pct / 100.0
-        target_cpa = st.number_input("CPA (FTD) alvo (R$)", value=0.0, step=25.0, format="%.0f")
+            st.markdown("### Instagram Reels")
+            reels_qty = st.number_input("Qtd Reels", min_value=0, value=0, step=1)
+            reels_avg_views = st.number_input("Views médias por Reel", min_value=0.0, value=0.0, step=1000.0, format="%.0f")
+            reels_ctr_pct = st.number_input("CTR Reels (%)", min_value=0.0, max_value=100.0, value=0.0, step=0.1, format="%.0f")
+            reels_ctr = reels_ctr_pct / 100.0
+            st.markdown("### Instagram Stories")
+            stories_qty = st.number_input("Qtd Stories (frames/combos)", min_value=0, value=0, step=1)
+            stories_avg_views = st.number_input("Views médias por Story", min_value=0.0, value=0.0, step=1000.0)
+            stories_ctr_pct = st.number_input("CTR Stories (%)", min_value=0.0, max_value=100.0, value=0.0, step=0.1, format="%.0f")
+            stories_ctr = stories_ctr_pct / 100.0
+
+            st.markdown("### TikTok")
+            tiktok_qty = st.number_input("Qtd TikToks", min_value=0, value=0, step=1)
+            tiktok_avg_views = st.number_input("Views médias por TikTok", min_value=0.0, value=0.0, step=1000.0)  
+            tiktok_ctr_pct = st.number_input("CTR TikTok (%)", min_value=0.0, max_value=100.0, value=0.0, step=0.1)
+            tiktok_ctr = tiktok_ctr_pct / 100.0
+
+            st.markdown("### Funil (FTD)")
+            # Dentro do form o checkbox só vale no submit, então o campo fica sempre visível
+            manual_clicks_toggle = st.checkbox("Tenho cliques reais (sobrescrever CTR)", value=False)
+            manual_clicks_value = st.number_input("Cliques reais (total)", min_value=0.0, value=0.0, step=50.0, format="%.0f")
+            manual_clicks = manual_clicks_value if manual_clicks_toggle else None
+
+            manual_ftd_toggle = st.checkbox("Tenho FTD real (sobrescrever projeção)", value=False)
+            manual_ftd_value = st.number_input("FTD real (total)", min_value=0.0, value=0.0, step=1.0, format="%.0f")
+            manual_ftd = manual_ftd_value if manual_ftd_toggle else None
+
+            cvr_ftd_pct = st.number_input("CVR para FTD (%)", min_value=0.0, max_value=100.0, value=0.0, step=1.0, format="%.0f")
+            cvr_ftd = cvr_ftd_pct / 100.0
+            value_per_ftd = st.number_input("Valor por FTD (R$) — LTV/NGR médio", min_value=0.0, value=0.0, step=50.0, format="%.0f")
+
+            st.markdown("### Metas")
+            target_roi_pct = st.number_input("ROI alvo (%)", min_value=-100.0, max_value=1000.0, value=0.0, step=5.0)
+            target_roi = target_roi_pct / 100.0
+            target_cpa = st.number_input("CPA (FTD) alvo (R$)", value=0.0, step=25.0, format="%.0f")
+
+            st.form_submit_button("Calcular")
 
     with c2:
         st.subheader("Resultados")
-        res = influencer_calcs(
+        res = _cached_influencer_calcs(
             fee=fee,
             reels_qty=reels_qty, reels_avg_views=reels_avg_views, reels_ctr=reels_ctr,
             stories_qty=stories_qty, stories_avg_views=stories_avg_views, stories_ctr=stories_ctr,
@@ -185,32 +240,46 @@ with tabs[0]:
             value_per_ftd=value_per_ftd,
         )
 
+        max_fee_roi = fee_max_by_roi(res.revenue, target_roi) if res.revenue is not None else None
+        max_fee_cpa = fee_max_by_cpa(target_cpa, res.ftd) if res.ftd is not None else None
+
+        f = _fmt_all({
+            "total_views": (res.total_views, fmt_int),
+            "clicks": (res.clicks, fmt_int),
+            "ftd": (res.ftd, fmt_float, 1),
+            "revenue": (res.revenue, fmt_money),
+            "cpm": (res.cpm, fmt_money),
+            "cpc": (res.cpc, fmt_money),
+            "cpa_ftd": (res.cpa_ftd, fmt_money),
+            "roas": (res.roas, fmt_float, 2),
+            "roi": (res.roi, fmt_float, 2),
+            "max_fee_roi": (max_fee_roi, fmt_money),
+            "max_fee_cpa": (max_fee_cpa, fmt_money),
+        })
+
         k1, k2, k3, k4 = st.columns(4)
-        k1.metric("Views totais (proxy impressões)", fmt_int(res["total_views"]))
-        k2.metric("Cliques (estimado/real)", fmt_int(res["clicks"]))
-        k3.metric("FTD (proj./real)", fmt_float(res["ftd"], 1))
-        k4.metric("Receita (FTD * valor)", fmt_money(res["revenue"]))
+        k1.metric("Views totais (proxy impressões)", f["total_views"])
+        k2.metric("Cliques (estimado/real)", f["clicks"])
+        k3.metric("FTD (proj./real)", f["ftd"])
+        k4.metric("Receita (FTD * valor)", f["revenue"])
 
         k5, k6, k7, k8, k9 = st.columns(5)
-        k5.metric("CPM", fmt_money(res["cpm"]))
-        k6.metric("CPC", fmt_money(res["cpc"]))
-        k7.metric("CPA (FTD)", fmt_money(res["cpa_ftd"]))
-        k8.metric("ROAS", fmt_float(res["roas"], 2))
-        k9.metric("ROI", fmt_float(res["roi"], 2))
+        k5.metric("CPM", f["cpm"])
+        k6.metric("CPC", f["cpc"])
+        k7.metric("CPA (FTD)", f["cpa_ftd"])
+        k8.metric("ROAS", f["roas"])
+        k9.metric("ROI", f["roi"])
 
         st.markdown("### Fee máximo para bater metas")
-        max_fee_roi = fee_max_by_roi(res["revenue"], target_roi) if res["revenue"] is not None else None
-        max_fee_cpa = fee_max_by_cpa(target_cpa, res["ftd"]) if res["ftd"] is not None else None
-
         a, b = st.columns(2)
-        a.metric("Fee máx p/ ROI alvo", fmt_money(max_fee_roi))
-        b.metric("Fee máx p/ CPA alvo", fmt_money(max_fee_cpa))
+        a.metric("Fee máx p/ ROI alvo", f["max_fee_roi"])
+        b.metric("Fee máx p/ CPA alvo", f["max_fee_cpa"])
 
         verdicts = []
-        if res["roi"] is not None:
-            verdicts.append(res["roi"] >= target_roi)
-        if res["cpa_ftd"] is not None:
-            verdicts.append(res["cpa_ftd"] <= target_cpa)
+        if res.roi is not None:
+            verdicts.append(res.roi >= target_roi)
+        if res.cpa_ftd is not None:
+            verdicts.append(res.cpa_ftd <= target_cpa)
 
         if verdicts and all(verdicts):
             st.success("✅ Cenário saudável (bate ROI e CPA).")
@@ -221,8 +290,6 @@ with tabs[0]:
 
     # ===== Relatório Excel (Influenciador) =====
     influencer_row = {
-        "timestamp_utc": datetime.now(timezone.utc).isoformat(),
-    
         # Inputs principais
         "influencer_name": influencer_name,
         "fee": float(fee),
@@ -248,23 +315,23 @@ with tabs[0]:
         "target_cpa": float(target_cpa),
     
         # Outputs
-        "total_views": res.get("total_views"),
-        "clicks": res.get("clicks"),
-        "ftd": res.get("ftd"),
-        "revenue": res.get("revenue"),
+        "total_views": res.total_views,
+        "clicks": res.clicks,
+        "ftd": res.ftd,
+        "revenue": res.revenue,
     
-        "cpm": res.get("cpm"),
-        "cpc": res.get("cpc"),
-        "cpa_ftd": res.get("cpa_ftd"),
-        "roas": res.get("roas"),
-        "roi": res.get("roi"),
+        "cpm": res.cpm,
+        "cpc": res.cpc,
+        "cpa_ftd": res.cpa_ftd,
+        "roas": res.roas,
+        "roi": res.roi,
     
         # Fee máximo (se você já calcula esses)
         "max_fee_roi": max_fee_roi if "max_fee_roi" in locals() else None,
         "max_fee_cpa": max_fee_cpa if "max_fee_cpa" in locals() else None,
     }
     
-    xlsx_bytes = df_to_xlsx_bytes({"Influenciador": pd.DataFrame([influencer_row])})
+    xlsx_bytes = report_xlsx_bytes("Influenciador", influencer_row)
     
     safe_name = (influencer_name or "influenciador").strip().replace(" ", "_").replace("/", "_")
     file_name = f"relatorio_influenciador_{safe_name}.xlsx"
@@ -298,32 +365,31 @@ with tabs[1]:
         )
         st.session_state.twitch_channel = raw_channel
         
-        channel = (st.session_state.twitch_channel or "").lower().strip()
-        channel = re.sub(r"^https?://(www\.)?twitch\.tv/", "", channel)
-        channel = channel.split("?")[0].strip("/").replace("@", "")
-
+        channel = normalize_twitch_login(st.session_state.twitch_channel)
 
+        with st.form("tw_inputs"):
+            planned_hours = st.number_input(
+                "Horas contratadas (mês)",
+                min_value=0.0, value=0.0, step=1.0, format="%.0f"
+            )
+            churn_factor = st.number_input(
+                "Fator de churn (estimativa p/ views únicas)",
+                min_value=0.5, value=1.0, step=1.0, format="%.0f"
+            )
 
-        planned_hours = st.number_input(
-            "Horas contratadas (mês)",
-            min_value=0.0, value=0.0, step=1.0, format="%.0f"
-        )
-        churn_factor = st.number_input(
-            "Fator de churn (estimativa p/ views únicas)",
-            min_value=0.5, value=1.0, step=1.0, format="%.0f"
-        )
+            st.markdown("### Dados do streamer (manual)")
+            # keys por canal, pra não precisar digitar tudo de novo quando trocar
+            def k(name: str) -> str:
+                return f"tw_{channel}_{name}"
 
-        st.markdown("### Dados do streamer (manual)")
-        # keys por canal, pra não precisar digitar tudo de novo quando trocar
-        def k(name: str) -> str:
-            return f"tw_{channel}_{name}"
+            avg_viewers = st.number_input("Average viewers", min_value=0.0, value=0.0, step=1.0, format="%.0f", key=k("avg"))
+            hours_watched = st.number_input("Hours watched (30d)", min_value=0.0, value=0.0, step=1000.0, format="%.0f", key=k("hw"))
+            followers_gained = st.number_input("Followers gained (30d)", min_value=0.0, value=0.0, step=10.0, format="%.0f", key=k("fg"))
+            peak_viewers = st.number_input("Peak viewers (30d)", min_value=0.0, value=0.0, step=1.0, format="%.0f", key=k("peak"))
+            hours_streamed = st.number_input("Hours streamed (30d)", min_value=0.0, value=0.0, step=1.0, format="%.0f", key=k("hs"))
+            streams = st.number_input("Streams (30d)", min_value=0.0, value=0.0, step=1.0, format="%.0f", key=k("streams"))
 
-        avg_viewers = st.number_input("Average viewers", min_value=0.0, value=0.0, step=1.0, format="%.0f", key=k("avg"))
-        hours_watched = st.number_input("Hours watched (30d)", min_value=0.0, value=0.0, step=1000.0, format="%.0f", key=k("hw"))
-        followers_gained = st.number_input("Followers gained (30d)", min_value=0.0, value=0.0, step=10.0, format="%.0f", key=k("fg"))
-        peak_viewers = st.number_input("Peak viewers (30d)", min_value=0.0, value=0.0, step=1.0, format="%.0f", key=k("peak"))
-        hours_streamed = st.number_input("Hours streamed (30d)", min_value=0.0, value=0.0, step=1.0, format="%.0f", key=k("hs"))
-        streams = st.number_input("Streams (30d)", min_value=0.0, value=0.0, step=1.0, format="%.0f", key=k("streams"))
+            st.form_submit_button("Calcular")
 
     
     # ---------- RIGHT: dashboard ----------
@@ -331,39 +397,51 @@ with tabs[1]:
         if not channel:
             st.info("Selecione/cole um canal (login ou URL).")
         else:
+            # 1) Calcula projeções
+            proj = _cached_project_twitch(
+                planned_hours=planned_hours,
+                avg_viewers_30d=avg_viewers,
+                peak_30d=int(peak_viewers),
+                churn_factor=churn_factor,
+                vod_views_per_hour=None,
+            )
+
+            f = _fmt_all({
+                "avg_viewers": (avg_viewers, fmt_int),
+                "hours_watched": (hours_watched, fmt_int),
+                "followers_gained": (followers_gained, fmt_int),
+                "peak_viewers": (peak_viewers, fmt_int),
+                "hours_streamed": (hours_streamed, fmt_int),
+                "streams": (streams, fmt_int),
+                "projected_avg_viewers": (proj.projected_avg_viewers, fmt_int),
+                "projected_peak": (proj.projected_peak, fmt_int),
+                "projected_hours_watched": (proj.projected_hours_watched, fmt_int),
+                "projected_unique_views": (proj.projected_unique_views, fmt_int),
+            })
+
             # Mostra os dados manuais (seis campos)
             top = st.columns(6)
-            top[0].metric("Average viewers", fmt_int(avg_viewers))
-            top[1].metric("Hours watched (30d)", fmt_int(hours_watched))
-            top[2].metric("Followers gained (30d)", fmt_int(followers_gained))
-            top[3].metric("Peak viewers (30d)", fmt_int(peak_viewers))
-            top[4].metric("Hours streamed (30d)", fmt_int(hours_streamed))
-            top[5].metric("Streams (30d)", fmt_int(streams))
+            top[0].metric("Average viewers", f["avg_viewers"])
+            top[1].metric("Hours watched (30d)", f["hours_watched"])
+            top[2].metric("Followers gained (30d)", f["followers_gained"])
+            top[3].metric("Peak viewers (30d)", f["peak_viewers"])
+            top[4].metric("Hours streamed (30d)", f["hours_streamed"])
+            top[5].metric("Streams (30d)", f["streams"])
 
             st.markdown("---")
             st.subheader("Projeções (com base nos dados manuais)")
 
-            # 1) Calcula projeções
-            proj = project_twitch(
-                planned_hours=float(planned_hours),
-                avg_viewers_30d=float(avg_viewers) if avg_viewers is not None else 0.0,
-                peak_30d=int(peak_viewers) if peak_viewers is not None else 0,
-                churn_factor=float(churn_factor),
-                vod_views_per_hour=None,
-            )
-            
             # 2) Mostra os resultados (IMAGEM 2)
             p1, p2, p3, p4 = st.columns(4)
-            p1.metric("Avg viewers projetado", fmt_int(proj.get("projected_avg_viewers")))
-            p2.metric("Peak projetado", fmt_int(proj.get("projected_peak")))
-            p3.metric("Hours watched (proj.)", fmt_int(proj.get("projected_hours_watched")))
-            p4.metric("Views únicas (proj.)", fmt_int(proj.get("projected_unique_views")))
+            p1.metric("Avg viewers projetado", f["projected_avg_viewers"])
+            p2.metric("Peak projetado", f["projected_peak"])
+            p3.metric("Hours watched (proj.)", f["projected_hours_watched"])
+            p4.metric("Views únicas (proj.)", f["projected_unique_views"])
             
             st.caption("Obs.: ‘views únicas’ é uma estimativa usando churn_factor. Ajuste conforme sua realidade.")
             
             # 3) Botão Excel (depois das métricas)
             twitch_row = {
-                "timestamp_utc": datetime.now(timezone.utc).isoformat(),
                 "channel": channel,
                 "planned_hours_month": float(planned_hours),
                 "churn_factor": float(churn_factor),
@@ -375,13 +453,13 @@ with tabs[1]:
                 "hours_streamed_30d": float(hours_streamed),
                 "streams_30d": float(streams),
             
-                "projected_avg_viewers": proj.get("projected_avg_viewers"),
-                "projected_peak": proj.get("projected_peak"),
-                "projected_hours_watched": proj.get("projected_hours_watched"),
-                "projected_unique_views": proj.get("projected_unique_views"),
+                "projected_avg_viewers": proj.projected_avg_viewers,
+                "projected_peak": proj.projected_peak,
+                "projected_hours_watched": proj.projected_hours_watched,
+                "projected_unique_views": proj.projected_unique_views,
             }
             
-            xlsx_bytes = df_to_xlsx_bytes({"Twitch": pd.DataFrame([twitch_row])})
+            xlsx_bytes = report_xlsx_bytes("Twitch", twitch_row)
             
             st.download_button(
                 "📥 Baixar relatório Excel (Twitch)",
@@ -2,7 +2,7 @@ import os
 import time
 import argparse
 from datetime import datetime, timezone
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 
@@ -10,19 +10,23 @@ from twitch_client import TwitchClient
 import storage
 
 def read_channels_file(path: str) -> List[str]:
-    out: List[str] = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            s = line.strip()
-            if s and not s.startswith("#"):
-                out.append(s.lower())
-    seen = set()
-    uniq = []
-    for c in out:
-        if c not in seen:
-            seen.add(c)
-            uniq.append(c)
-    return uniq
+    with open(path, "rb") as f:
+        lines = (line.strip() for line in f.read().splitlines())
+    return list(dict.fromkeys(b.decode("utf-8").lower() for b in lines if b and not b.startswith(b"#")))
+
+def sample_row(ts: str, login: str, s: Optional[Dict[str, Any]]) -> Tuple[Any, ...]:
+    if not s:
+        return (ts, login, 0, 0, None, None, None, None)
+    return (
+        ts,
+        login,
+        1,
+        int(s.get("viewer_count", 0)),
+        s.get("game_name"),
+        s.get("title"),
+        s.get("started_at"),
+        s.get("id"),
+    )
 
 def main():
     load_dotenv()
@@ -60,25 +64,10 @@ def main():
             time.sleep(args.interval)
             continue
 
-        rows = []
-        for login in channels:
-            s = live_map.get(login)
-            if s:
-                rows.append((
-                    ts,
-                    login,
-                    1,
-                    int(s.get("viewer_count", 0)),
-                    s.get("game_name"),
-                    s.get("title"),
-                    s.get("started_at"),
-                    s.get("id"),
-                ))
-            else:
-                rows.append((ts, login, 0, 0, None, None, None, None))
+        rows = (sample_row(ts, login, live_map.get(login)) for login in channels)
 
         storage.insert_stream_samples(conn, rows)
-        print(f"[collector] {ts} saved {len(rows)} samples (live={len(live_map)})")
+        print(f"[collector] {ts} saved {len(channels)} samples (live={len(live_map)})")
 
         time.sleep(args.interval)
 
@@ -1,10 +1,36 @@
-from typing import Optional, Dict
+from dataclasses import dataclass
+from typing import Optional
 
 def safe_div(a: float, b: float) -> Optional[float]:
     if b is None or b == 0:
         return None
     return a / b
 
+@dataclass(slots=True, frozen=True)
+class InfluencerResult:
+    total_views: float
+    clicks: float
+    ftd: float
+    revenue: float
+    cpm: Optional[float]
+    cpc: Optional[float]
+    cpa_ftd: Optional[float]
+    roas: Optional[float]
+    roi: Optional[float]
+
+# Resultado de influencer_calcs quando nada foi preenchido (tudo zerado)
+_ZERO_RESULT = InfluencerResult(
+    total_views=0.0,
+    clicks=0.0,
+    ftd=0.0,
+    revenue=0.0,
+    cpm=None,
+    cpc=None,
+    cpa_ftd=None,
+    roas=None,
+    roi=None,
+)
+
 def influencer_calcs(
     fee: float,
     reels_qty: int, reels_avg_views: float, reels_ctr: float,
@@ -14,7 +40,10 @@ def influencer_calcs(
     manual_ftd: Optional[float],
     cvr_ftd: float,
     value_per_ftd: float,
-) -> Dict[str, Optional[float]]:
+) -> InfluencerResult:
+    if fee == 0 and reels_qty == 0 and stories_qty == 0 and tiktok_qty == 0 and not manual_clicks and not manual_ftd:
+        return _ZERO_RESULT
+
     reels_views = reels_qty * reels_avg_views
     stories_views = stories_qty * stories_avg_views
     tiktok_views = tiktok_qty * tiktok_avg_views
@@ -34,17 +63,17 @@ def influencer_calcs(
     roas = safe_div(revenue, fee) if fee > 0 else None
     roi = safe_div((revenue - fee), fee) if fee > 0 else None
 
-    return {
-        "total_views": total_views,
-        "clicks": clicks,
-        "ftd": ftd,
-        "revenue": revenue,
-        "cpm": cpm,
-        "cpc": cpc,
-        "cpa_ftd": cpa,
-        "roas": roas,
-        "roi": roi,
-    }
+    return InfluencerResult(
+        total_views=total_views,
+        clicks=clicks,
+        ftd=ftd,
+        revenue=revenue,
+        cpm=cpm,
+        cpc=cpc,
+        cpa_ftd=cpa,
+        roas=roas,
+        roi=roi,
+    )
 
 def fee_max_by_roi(revenue: float, target_roi: float) -> Optional[float]:
     denom = 1.0 + target_roi
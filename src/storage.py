@@ -1,6 +1,6 @@
 import os
 import sqlite3
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 
 def ensure_parent_dir(path: str) -> None:
@@ -10,8 +10,17 @@ def ensure_parent_dir(path: str) -> None:
 def connect(db_path: str) -> sqlite3.Connection:
     ensure_parent_dir(db_path)
     conn = sqlite3.connect(db_path, check_same_thread=False)
-    conn.execute("PRAGMA journal_mode=WAL;")
-    conn.execute("PRAGMA synchronous=NORMAL;")
+    # page_size só tem efeito na criação do arquivo (precisa vir antes do WAL)
+    conn.executescript(
+        '''
+        PRAGMA page_size=8192;
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-20000;
+        PRAGMA mmap_size=268435456;
+        '''
+    )
     return conn
 
 def init_db(conn: sqlite3.Connection) -> None:
@@ -30,6 +39,11 @@ def init_db(conn: sqlite3.Connection) -> None:
         '''
     )
     conn.execute("CREATE INDEX IF NOT EXISTS idx_samples_login_ts ON stream_samples(user_login, ts_utc);")
+    # cobre o filtro + viewer_count do stats 30d (index-only scan)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_samples_login_live_ts "
+        "ON stream_samples(user_login, is_live, ts_utc, viewer_count);"
+    )
 
     conn.execute(
         '''
@@ -45,18 +59,16 @@ def init_db(conn: sqlite3.Connection) -> None:
     )
     conn.commit()
 
-def insert_stream_samples(conn: sqlite3.Connection, rows: List[Tuple[Any, ...]]) -> None:
-    if not rows:
-        return
-    conn.executemany(
-        '''
-        INSERT INTO stream_samples
-        (ts_utc, user_login, is_live, viewer_count, game_name, title, started_at, stream_id)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?);
-        ''',
-        rows,
-    )
-    conn.commit()
+def insert_stream_samples(conn: sqlite3.Connection, rows: Iterable[Tuple[Any, ...]]) -> None:
+    with conn:
+        conn.executemany(
+            '''
+            INSERT INTO stream_samples
+            (ts_utc, user_login, is_live, viewer_count, game_name, title, started_at, stream_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+            ''',
+            rows,
+        )
 
 def _since_utc(days: int) -> str:
     dt = datetime.now(timezone.utc) - timedelta(days=days)
@@ -66,31 +78,24 @@ def get_stream_stats_30d(conn: sqlite3.Connection, user_login: str) -> Dict[str,
     since = _since_utc(30)
     cur = conn.cursor()
 
+    login = user_login.lower()
     cur.execute(
         '''
         SELECT
           COUNT(*) as live_samples,
           AVG(viewer_count) as avg_viewers,
           MAX(viewer_count) as peak_viewers,
-          MAX(ts_utc) as last_live_sample
+          MAX(ts_utc) as last_live_sample,
+          (SELECT MAX(ts_utc) FROM stream_samples WHERE user_login = ?) as last_any
         FROM stream_samples
         WHERE user_login = ?
-          AND ts_utc >= ?
-          AND is_live = 1;
+          AND is_live = 1
+          AND ts_utc >= ?;
         ''',
-        (user_login.lower(), since),
+        (login, login, since),
     )
     row = cur.fetchone()
-    live_samples, avg_viewers, peak_viewers, last_live_sample = row if row else (0, None, None, None)
-
-    cur.execute(
-        '''
-        SELECT MAX(ts_utc) FROM stream_samples
-        WHERE user_login = ?;
-        ''',
-        (user_login.lower(),),
-    )
-    last_any = cur.fetchone()[0]
+    live_samples, avg_viewers, peak_viewers, last_live_sample, last_any = row if row else (0, None, None, None, None)
 
     return {
         "live_samples_30d": int(live_samples or 0),
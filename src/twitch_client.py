@@ -1,11 +1,64 @@
+import json
 import time
+import threading
+import weakref
+from collections import OrderedDict
 import requests
-from typing import Any, Dict, List, Optional
+import urllib3
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 TOKEN_URL = "https://id.twitch.tv/oauth2/token"
 API_BASE = "https://api.twitch.tv/helix"
+CHUNK_SIZE = 100  # máximo de logins por request na Helix
+MAX_WORKERS = 8
+VOD_CACHE_TTL = 60.0  # segundos
+VOD_CACHE_MAX = 256  # entradas (user_id, first)
+RATELIMIT_MIN_REMAINING = 5
+USER_MISS_TTL = 86400.0  # 24h
+
+def _new_session() -> requests.Session:
+    s = requests.Session()
+    # pool keep-alive p/ api.twitch.tv, com retry em 5xx (429 é tratado em TwitchClient._get)
+    s.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=64,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[500, 502, 503, 504],
+                allowed_methods=["GET"],
+                raise_on_status=False,  # última resposta 5xx segue p/ raise_for_status()
+            ),
+        ),
+    )
+    return s
+
+# sessão compartilhada por todos os TwitchClient do processo (uma conexão quente serve a todos)
+_SESSION = _new_session()
+
+def _refresh_token_bg(ref: "weakref.ReferenceType[TwitchClient]") -> None:
+    # o Timer só guarda weakref: cliente descartado é coletado e a renovação para
+    client = ref()
+    if client is not None:
+        client._refresh_token_bg()
+
+def get_session() -> requests.Session:
+    return _SESSION
+
+def set_session(session: requests.Session) -> None:
+    global _SESSION
+    _SESSION = session
 
 class TwitchClient:
+    _USERS_URL = f"{API_BASE}/users"
+    _STREAMS_URL = f"{API_BASE}/streams"
+    _VIDEOS_URL = f"{API_BASE}/videos"
+
     def __init__(self, client_id: str, client_secret: str, timeout: int = 20):
         if not client_id or not client_secret:
             raise ValueError("TWITCH_CLIENT_ID e TWITCH_CLIENT_SECRET são obrigatórios.")
@@ -15,82 +68,254 @@ class TwitchClient:
 
         self._token: Optional[str] = None
         self._token_exp: float = 0.0
-        self._session = requests.Session()
+        self._headers_cache: Optional[Dict[str, str]] = None
+        self._token_lock = threading.Lock()
+        self._refresh_timer: Optional[threading.Timer] = None
+        self._login_to_id: Dict[str, str] = {}
+        self._user_miss: Dict[str, float] = {}  # login -> expira em (epoch)
+        self._ratelimit_remaining = 800
+        self._ratelimit_reset = 0.0
+        # (user_id, first) -> (ts, etag, data)
+        self._vod_lock = threading.Lock()
+        self._vod_cache: "OrderedDict[Tuple[str, int], Tuple[float, str, List[Dict[str, Any]]]]" = OrderedDict()
+        self._token_pool = urllib3.PoolManager(
+            num_pools=1,
+            maxsize=1,
+            retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["POST"],
+                raise_on_status=False,  # 429/5xx final cai no r.status >= 400 abaixo
+            ),
+        )
 
-    def _get_app_token(self) -> str:
-        now = time.time()
-        if self._token and now < (self._token_exp - 60):
-            return self._token
+    @property
+    def _session(self) -> requests.Session:
+        return _SESSION
 
-        r = self._session.post(
-            TOKEN_URL,
-            data={
-                "client_id": self.client_id,
-                "client_secret": self.client_secret,
-                "grant_type": "client_credentials",
-            },
-            timeout=self.timeout,
-        )
-        r.raise_for_status()
-        j = r.json()
+    def _mint_token(self) -> None:
+        now = time.time()
+        # pool próprio (urllib3 direto): token não compete com o pool da API
+        try:
+            r = self._token_pool.request(
+                "POST",
+                TOKEN_URL,
+                fields={
+                    "client_id": self.client_id,
+                    "client_secret": self.client_secret,
+                    "grant_type": "client_credentials",
+                },
+                encode_multipart=False,
+                timeout=self.timeout,
+            )
+        except urllib3.exceptions.HTTPError as e:
+            # mesma família de exceção do caminho via requests
+            raise requests.RequestException(f"Falha ao obter token da Twitch: {e}") from e
+        if r.status >= 400:
+            raise requests.HTTPError(f"{r.status} ao obter token da Twitch: {r.data[:200]!r}")
+        j = json.loads(r.data)
         self._token = j["access_token"]
+        self._headers_cache = {"Client-Id": self.client_id, "Authorization": f"Bearer {self._token}"}
         expires_in = int(j.get("expires_in", 3600))
         self._token_exp = now + expires_in
-        return self._token
+        self._schedule_refresh(expires_in)
+
+    def _schedule_refresh(self, expires_in: float) -> None:
+        # renova em background 5 min antes de expirar; request do usuário não espera o POST
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+        self._refresh_timer = threading.Timer(max(expires_in - 300, 60), _refresh_token_bg, args=(weakref.ref(self),))
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def close(self) -> None:
+        # cancela a renovação em background (cliente descartado/recriado)
+        timer = getattr(self, "_refresh_timer", None)  # __init__ pode ter falhado antes
+        if timer is not None:
+            timer.cancel()
+            self._refresh_timer = None
+
+    def __del__(self) -> None:
+        self.close()
+
+    def _refresh_token_bg(self) -> None:
+        try:
+            with self._token_lock:
+                self._mint_token()
+        except Exception:
+            pass  # se falhar, o próximo request renova pelo caminho normal
+
+    def _get_app_token(self) -> str:
+        if self._token and time.time() < (self._token_exp - 60):
+            return self._token
+        with self._token_lock:
+            if not self._token or time.time() >= (self._token_exp - 60):
+                self._mint_token()
+            return self._token
 
     def _headers(self) -> Dict[str, str]:
-        token = self._get_app_token()
-        return {"Client-Id": self.client_id, "Authorization": f"Bearer {token}"}
+        # dict só é refeito quando um token novo é emitido
+        headers = self._headers_cache
+        if headers is None or time.time() >= (self._token_exp - 60):
+            self._get_app_token()
+            headers = self._headers_cache
+        return headers
+
+    def _get(self, url: str, **kwargs: Any) -> requests.Response:
+        # segura localmente quando o bucket da Helix está quase vazio, em vez de tomar 429
+        if self._ratelimit_remaining < RATELIMIT_MIN_REMAINING:
+            time.sleep(max(0.0, self._ratelimit_reset - time.time()))
+        r = self._session.get(url, **kwargs)
+        self._track_ratelimit(r)
+        if r.status_code == 429:
+            # Helix não manda Retry-After: o bucket só enche no Ratelimit-Reset, então espera e tenta 1x
+            time.sleep(max(0.0, self._ratelimit_reset - time.time()))
+            r = self._session.get(url, **kwargs)
+            self._track_ratelimit(r)
+        return r
+
+    def _track_ratelimit(self, r: requests.Response) -> None:
+        if "Ratelimit-Remaining" in r.headers:
+            self._ratelimit_remaining = int(r.headers["Ratelimit-Remaining"])
+            self._ratelimit_reset = float(r.headers.get("Ratelimit-Reset", 0))
 
     def api_get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         url = f"{API_BASE}{path}"
-        r = self._session.get(url, headers=self._headers(), params=params or {}, timeout=self.timeout)
+        r = self._get(url, headers=self._headers(), params=params or {}, timeout=self.timeout)
         r.raise_for_status()
         return r.json()
 
+    def _fetch_chunk(self, url: str, key: str, chunk: List[str]) -> List[Dict[str, Any]]:
+        r = self._get(
+            url,
+            headers=self._headers(),
+            params=[(key, l) for l in chunk],
+            timeout=self.timeout,
+        )
+        r.raise_for_status()
+        return r.json().get("data", [])
+
+    def _fetch_chunked(self, url: str, key: str, logins: List[str]) -> List[List[Dict[str, Any]]]:
+        chunks = [logins[i:i + CHUNK_SIZE] for i in range(0, len(logins), CHUNK_SIZE)]
+        if len(chunks) == 1:
+            return [self._fetch_chunk(url, key, chunks[0])]
+        # token antes das threads, pra não disputarem o refresh
+        self._get_app_token()
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(chunks))) as ex:
+            return list(ex.map(lambda c: self._fetch_chunk(url, key, c), chunks))
+
     def get_users_by_logins(self, logins: List[str]) -> Dict[str, Dict[str, Any]]:
         if not logins:
             return {}
+        now = time.time()
+        # pula logins que já voltaram vazios (banidos/inexistentes) dentro do TTL
+        logins = [l.lower() for l in logins]
+        if self._user_miss:
+            # descarta os vencidos, senão o dict cresce pra sempre no coletor
+            for l, exp in list(self._user_miss.items()):
+                if exp <= now:
+                    self._user_miss.pop(l, None)
+            logins = [l for l in logins if l not in self._user_miss]
         out: Dict[str, Dict[str, Any]] = {}
-        chunk_size = 100
-        for i in range(0, len(logins), chunk_size):
-            chunk = logins[i:i + chunk_size]
-            params = [("login", l) for l in chunk]
-            r = self._session.get(
-                f"{API_BASE}/users",
-                headers=self._headers(),
-                params=params,
-                timeout=self.timeout,
-            )
-            r.raise_for_status()
-            data = r.json().get("data", [])
+        if not logins:
+            return out
+        # a Helix já devolve login em minúsculas
+        for data in self._fetch_chunked(self._USERS_URL, "login", logins):
             for u in data:
-                out[u["login"].lower()] = u
+                out[u["login"]] = u
+                self._login_to_id[u["login"]] = u["id"]
+        for l in logins:
+            if l not in out:
+                self._user_miss[l] = now + USER_MISS_TTL
         return out
 
+    def invalidate_miss(self, login: str) -> None:
+        self._user_miss.pop(login.lower(), None)
+
+    def get_user_ids(self, logins: List[str]) -> Dict[str, str]:
+        # login -> id não muda: só vai na API para logins ainda não vistos
+        logins = [l.lower() for l in logins]
+        missing = [l for l in logins if l not in self._login_to_id]
+        if missing:
+            self.get_users_by_logins(missing)
+        return {l: self._login_to_id[l] for l in logins if l in self._login_to_id}
+
     def get_streams_by_logins(self, logins: List[str]) -> Dict[str, Dict[str, Any]]:
         if not logins:
             return {}
+        logins = [l.lower() for l in logins]
         out: Dict[str, Dict[str, Any]] = {}
-        chunk_size = 100
-        for i in range(0, len(logins), chunk_size):
-            chunk = logins[i:i + chunk_size]
-            params = [("user_login", l) for l in chunk]
-            r = self._session.get(
-                f"{API_BASE}/streams",
-                headers=self._headers(),
-                params=params,
-                timeout=self.timeout,
-            )
-            r.raise_for_status()
-            data = r.json().get("data", [])
+        for data in self._fetch_chunked(self._STREAMS_URL, "user_login", logins):
             for s in data:
-                out[s["user_login"].lower()] = s
+                out[s["user_login"]] = s
         return out
 
+    def get_users_and_streams(self, logins: List[str]) -> Dict[str, Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        # perfil + status LIVE em paralelo: latência = max(users, streams)
+        logins = [l.lower() for l in logins]
+        if not logins:
+            return {}
+        self._get_app_token()
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            f_users = ex.submit(self.get_users_by_logins, logins)
+            f_streams = ex.submit(self.get_streams_by_logins, logins)
+            users, streams = f_users.result(), f_streams.result()
+        return {l: (users.get(l), streams.get(l)) for l in logins}
+
+    def _store_vods(self, key: Tuple[str, int], entry: Tuple[float, str, List[Dict[str, Any]]]) -> None:
+        # LRU limitado: descarta o usado há mais tempo
+        with self._vod_lock:
+            self._vod_cache[key] = entry
+            self._vod_cache.move_to_end(key)
+            while len(self._vod_cache) > VOD_CACHE_MAX:
+                self._vod_cache.popitem(last=False)
+
     def get_vods_by_user_id(self, user_id: str, first: int = 20) -> List[Dict[str, Any]]:
-        j = self.api_get(
-            "/videos",
-            params={"user_id": user_id, "first": min(max(int(first), 1), 100), "type": "archive"},
+        first = min(max(int(first), 1), 100)
+        key = (user_id, first)
+        now = time.time()
+        with self._vod_lock:
+            cached = self._vod_cache.get(key)
+            if cached:
+                self._vod_cache.move_to_end(key)
+        if cached and now - cached[0] < VOD_CACHE_TTL:
+            return [dict(v) for v in cached[2]]
+
+        headers = self._headers()
+        if cached and cached[1]:
+            headers = {**headers, "If-None-Match": cached[1]}
+        r = self._get(
+            self._VIDEOS_URL,
+            headers=headers,
+            params={"user_id": user_id, "first": first, "type": "archive"},
+            timeout=self.timeout,
         )
-        return j.get("data", [])
+        if r.status_code == 304 and cached:
+            # lista não mudou: só renova o TTL, sem baixar/parsear o corpo
+            self._store_vods(key, (now, cached[1], cached[2]))
+            return [dict(v) for v in cached[2]]
+        r.raise_for_status()
+        data = r.json().get("data", [])
+        self._store_vods(key, (now, r.headers.get("ETag", ""), data))
+        # cópia de cada VOD: quem altera a lista ou os dicts não corrompe o cache
+        return [dict(v) for v in data]
+
+    def _get_vods_page(self, user_id: str, cursor: Optional[str]) -> Dict[str, Any]:
+        params = {"user_id": user_id, "first": 100, "type": "archive"}
+        if cursor:
+            params["after"] = cursor
+        r = self._get(self._VIDEOS_URL, headers=self._headers(), params=params, timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def iter_vods(self, user_id: str) -> Iterator[Dict[str, Any]]:
+        # segue o cursor; a próxima página já é pedida enquanto a atual é consumida
+        with ThreadPoolExecutor(max_workers=1) as ex:
+            fut = ex.submit(self._get_vods_page, user_id, None)
+            while fut is not None:
+                j = fut.result()
+                data = j.get("data", [])
+                cursor = j.get("pagination", {}).get("cursor")
+                fut = ex.submit(self._get_vods_page, user_id, cursor) if (cursor and data) else None
+                yield from data